@@ -1,30 +1,90 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import sys
+import logging
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import re
-import json
+import html
+import orjson
 from datetime import datetime
 import time
+import threading
+import concurrent.futures
 
 # --- Configuration ---
 LOG_FILE = "websinu_agent.log"
-DELAY_BETWEEN_USERS_SECONDS = 5
+DELAY_BETWEEN_USERS_SECONDS = 5 # Only used when MAX_PARALLEL_USERS is 1
+MAX_PARALLEL_USERS = 8 # Set to 1 to process users one after another
+MAX_CONCURRENT_WEBSINU_REQUESTS = 4 # Upper bound on simultaneous requests to WebSinu across all users
+REQUEST_TIMEOUT_SECONDS = (3, 10) # (connect, read) timeout for every HTTP request
 # --- End Configuration ---
 
+# Matches the faculty/specialization arguments of the "Vizualizare note" link
+_NOTE_RE = re.compile(r"NoteSesiuneaCurenta\('([^']*)',\s*'([^']*)'\)")
+
+# Maps non-breaking spaces in subject names to regular spaces
+_NBSP_TABLE = str.maketrans({'\xa0': ' '})
+
+# Sentinel for dict lookups where None could be a legitimate value
+_MISSING = object()
+
+# Shared by all user threads to stay polite towards the WebSinu server
+_WEBSINU_REQUEST_SEMAPHORE = threading.Semaphore(MAX_CONCURRENT_WEBSINU_REQUESTS)
+
+# A dedicated logger keeps the log file open for the whole run and leaves third-party loggers untouched.
+# The thread name identifies the user being processed (see process_user).
+_LOGGER = logging.getLogger("websinu_agent")
+_LOGGER.setLevel(logging.DEBUG)
+_file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+_file_handler.setFormatter(logging.Formatter("[%(asctime)s] [%(levelname)s] [%(threadName)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+_LOGGER.addHandler(_file_handler)
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter("[%(levelname)s] [%(threadName)s] %(message)s"))
+_LOGGER.addHandler(_console_handler)
+
 def log_message(message, level="INFO"):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] [{level}] {message}\n"
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(log_entry)
-    print(f"[{level}] {message}")
+    _LOGGER.log(getattr(logging, level.upper(), logging.INFO), message)
+
+
+def build_http_adapter():
+    """
+    Returns an HTTPAdapter with a keep-alive connection pool that retries
+    transient connection failures.
+    """
+    # All requests here are POSTs, which urllib3 doesn't retry on error responses by default
+    retry = Retry(total=3, backoff_factor=0.3)
+    return HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+
+
+# Reused for every notification so the TLS connection to ntfy stays open
+_NTFY_SESSION = requests.Session()
+_NTFY_SESSION.mount("https://", build_http_adapter())
+# Sends notifications in the background; shut down at the end of the run to flush pending ones
+_NTFY_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="ntfy")
+
+
+def has_grades_page_title(tree):
+    """Returns True if the parsed page is the 'Note din sesiunea curenta' grades page."""
+    title = tree.css_first('title')
+    return title is not None and title.text() == "Note din sesiunea curenta"
 
 
 def send_ntfy_notification(global_ntfy_topic_url, message, title="WebSinu Grades Update", tags=None):
+    """
+    Queues the notification on the background ntfy executor so the caller
+    doesn't wait for the HTTP round trip.
+    """
     if not global_ntfy_topic_url:
         log_message("Ntfy topic URL is not configured. Cannot send notification.", level="WARNING")
         return
 
+    _NTFY_EXECUTOR.submit(_post_ntfy_notification, global_ntfy_topic_url, message, title, tags)
+
+
+def _post_ntfy_notification(global_ntfy_topic_url, message, title, tags):
     try:
         headers = {
             "Title": title,
@@ -32,7 +92,7 @@ def send_ntfy_notification(global_ntfy_topic_url, message, title="WebSinu Grades
         if tags:
             headers["Tags"] = ",".join(tags)
 
-        response = requests.post(global_ntfy_topic_url, data=message.encode('utf-8'), headers=headers)
+        response = _NTFY_SESSION.post(global_ntfy_topic_url, data=message.encode('utf-8'), headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
         response.raise_for_status()
         log_message(f"Ntfy notification sent successfully: '{message}'", level="INFO")
     except requests.exceptions.RequestException as e:
@@ -57,24 +117,30 @@ def login_websinu(username, password):
     }
 
     session = requests.Session()
+    session.mount("https://", build_http_adapter())
     session_sid = None
     initial_grades_page_html = None
 
     try:
         log_message("Attempting initial login POST request...")
-        response = session.post(login_url, data=payload)
+        with _WEBSINU_REQUEST_SEMAPHORE:
+            response = session.post(login_url, data=payload, timeout=REQUEST_TIMEOUT_SECONDS)
         response.raise_for_status()
 
-        if "document.frmData.submit()" in response.text and "roluri.asp" in response.text:
+        # The JavaScript redirect page is tiny, so its markers are always near the top of the body
+        head = response.content[:4096]
+        is_js_redirect = b"document.frmData.submit()" in head and b"roluri.asp" in head
+        tree_intermediate_or_direct = LexborHTMLParser(response.text)
+
+        if is_js_redirect:
             log_message("Detected JavaScript redirect page. Following...")
-            soup_intermediate = BeautifulSoup(response.text, 'html.parser')
-            form = soup_intermediate.find('form', {'name': 'frmData', 'action': 'roluri.asp'})
+            form = tree_intermediate_or_direct.css_first('form[name="frmData"][action="roluri.asp"]')
 
-            if form:
-                sid_input = form.find('input', {'name': 'sid'})
-                intermediate_sid = sid_input['value'] if sid_input else ''
-                hid_self_submit_input = form.find('input', {'name': 'hidSelfSubmit'})
-                intermediate_hid_self_submit = hid_self_submit_input['value'] if hid_self_submit_input else 'roluri.asp'
+            if form is not None:
+                sid_input = form.css_first('input[name="sid"]')
+                intermediate_sid = (sid_input.attributes.get('value') or '') if sid_input is not None else ''
+                hid_self_submit_input = form.css_first('input[name="hidSelfSubmit"]')
+                intermediate_hid_self_submit = (hid_self_submit_input.attributes.get('value') or 'roluri.asp') if hid_self_submit_input is not None else 'roluri.asp'
 
                 if intermediate_sid:
                     log_message(f"Extracted intermediate SID: {intermediate_sid}")
@@ -86,13 +152,13 @@ def login_websinu(username, password):
                         'hidNume_Specializare': ''
                     }
                     log_message("Sending second POST request to roluri.asp to complete login...")
-                    final_response = session.post(roluri_url, data=second_post_payload)
+                    with _WEBSINU_REQUEST_SEMAPHORE:
+                        final_response = session.post(roluri_url, data=second_post_payload, timeout=REQUEST_TIMEOUT_SECONDS)
                     final_response.raise_for_status()
 
                     initial_grades_page_html = final_response.text
 
-                    final_soup = BeautifulSoup(initial_grades_page_html, 'html.parser')
-                    if final_soup.title and final_soup.title.string == "Note din sesiunea curenta":
+                    if has_grades_page_title(LexborHTMLParser(initial_grades_page_html)):
                         log_message("Successfully completed login sequence and landed on grades selection page!")
                         session_sid = intermediate_sid
                         return session, session_sid, initial_grades_page_html
@@ -106,14 +172,13 @@ def login_websinu(username, password):
             else:
                 log_message("Could not find the intermediate form for JavaScript redirect.")
                 return None, None, None
-        elif BeautifulSoup(response.text, 'html.parser').title and BeautifulSoup(response.text, 'html.parser').title.string == "Note din sesiunea curenta":
+        elif has_grades_page_title(tree_intermediate_or_direct):
             log_message("Successfully logged into WebSinu directly (no JS redirect detected).")
             initial_grades_page_html = response.text
-            soup_direct = BeautifulSoup(initial_grades_page_html, 'html.parser')
-            form_on_page = soup_direct.find('form', {'name': 'frmData', 'action': 'roluri.asp'})
-            if form_on_page:
-                sid_input_direct = form_on_page.find('input', {'name': 'sid'})
-                session_sid = sid_input_direct['value'] if sid_input_direct else None
+            form_on_page = tree_intermediate_or_direct.css_first('form[name="frmData"][action="roluri.asp"]')
+            if form_on_page is not None:
+                sid_input_direct = form_on_page.css_first('input[name="sid"]')
+                session_sid = sid_input_direct.attributes.get('value') if sid_input_direct is not None else None
                 if session_sid:
                     log_message(f"Extracted SID from directly landed page: {session_sid}")
                     return session, session_sid, initial_grades_page_html
@@ -143,34 +208,41 @@ def get_grades(session, initial_sid, initial_grades_page_html):
     grades_post_url = "https://websinu.utcluj.ro/note/roluri.asp"
 
     try:
-        log_message("Parsing HTML from successful login to find faculty/specialization link.")
-        soup = BeautifulSoup(initial_grades_page_html, 'html.parser')
-
         sid_to_use = initial_sid
         if not sid_to_use:
             log_message("Error: Initial SID not provided to get_grades. Cannot proceed.", level="ERROR")
             return []
         log_message(f"Using SID obtained from login for grade view: {sid_to_use}")
 
-        view_notes_link = soup.find('a', href=lambda href: href and href.startswith("javascript: NoteSesiuneaCurenta"))
+        log_message("Searching HTML from successful login for faculty/specialization link.")
+        match = _NOTE_RE.search(initial_grades_page_html)
 
-        faculty_name = ""
-        specialization_name = ""
+        if match:
+            # A match on the raw markup still holds HTML entities (e.g. 'Automatic&#259;'), so decode them
+            faculty_name = html.unescape(match.group(1)).strip()
+            specialization_name = html.unescape(match.group(2)).strip()
+        else:
+            # The raw markup may encode the call itself differently (e.g. entity-encoded quotes), so parse it properly
+            log_message("'NoteSesiuneaCurenta' call not found in raw HTML. Falling back to parsing the page.", level="WARNING")
+            tree = LexborHTMLParser(initial_grades_page_html)
+            view_notes_link = tree.css_first('a[href^="javascript: NoteSesiuneaCurenta"]')
 
-        if view_notes_link:
-            js_call = view_notes_link['href']
-            match = re.search(r"NoteSesiuneaCurenta\('(.*?)',\s*'(.*?)'\)", js_call)
-            if match:
-                faculty_name = match.group(1).strip()
-                specialization_name = match.group(2).strip()
-                log_message(f"Found faculty: '{faculty_name}', specialization: '{specialization_name}'")
-            else:
+            if view_notes_link is None:
+                log_message("Could not find 'Vizualizare note' link (<a> tag with NoteSesiuneaCurenta call) on the provided HTML.", level="ERROR")
+                return []
+
+            js_call = view_notes_link.attributes['href']
+            match = _NOTE_RE.search(js_call)
+            if not match:
                 log_message("Could not parse 'NoteSesiuneaCurenta' arguments from link. Regex mismatch?", level="ERROR")
                 log_message(f"JavaScript call found: {js_call}", level="ERROR")
                 return []
-        else:
-            log_message("Could not find 'Vizualizare note' link (<a> tag with NoteSesiuneaCurenta call) on the provided HTML.", level="ERROR")
-            return []
+
+            # The parser has already decoded the entities in the href
+            faculty_name = match.group(1).strip()
+            specialization_name = match.group(2).strip()
+
+        log_message(f"Found faculty: '{faculty_name}', specialization: '{specialization_name}'")
 
         post_payload = {
             'hidSelfSubmit': 'roluri.asp',
@@ -181,39 +253,45 @@ def get_grades(session, initial_sid, initial_grades_page_html):
         }
 
         log_message("Sending POST request to display grades...")
-        grades_response = session.post(grades_post_url, data=post_payload)
+        with _WEBSINU_REQUEST_SEMAPHORE:
+            grades_response = session.post(grades_post_url, data=post_payload, timeout=REQUEST_TIMEOUT_SECONDS)
         grades_response.raise_for_status()
 
-        log_message("\n--- Full HTML content AFTER grades POST request (for grade extraction) ---", level="DEBUG")
-        log_message(grades_response.text, level="DEBUG")
-        log_message("--- End Full HTML content AFTER grades POST --- \n", level="DEBUG")
+        # Read here rather than at import time so WEBSINU_DEBUG=1 set in .env is picked up after load_dotenv()
+        if os.getenv("WEBSINU_DEBUG") == "1":
+            log_message("\n--- Full HTML content AFTER grades POST request (for grade extraction) ---", level="DEBUG")
+            log_message(grades_response.text, level="DEBUG")
+            log_message("--- End Full HTML content AFTER grades POST --- \n", level="DEBUG")
 
-        soup_grades = BeautifulSoup(grades_response.text, 'html.parser')
+        tree_grades = LexborHTMLParser(grades_response.text)
+
+        if tree_grades.css_first('table.table') is None:
+            log_message("Could not find any grades table (<table class=\"table\">) on the grades page.", level="WARNING")
+            return []
 
         raw_grades_list = [] # Store all raw entries, including duplicates for now
-        for tr in soup_grades.find_all('tr'):
-            tds = tr.find_all('td', recursive=False)
+        # Grades may be split over several tables; only rows directly under one of them hold grades
+        for tr in tree_grades.css('table.table > tbody > tr, table.table > tr'):
+            tds = [node for node in tr.iter() if node.tag == 'td']
             if len(tds) == 6:
-                parent_table = tr.find_parent('table')
-                if parent_table and 'class' in parent_table.attrs and 'table' in parent_table['class']:
-                    try:
-                        year = tds[0].get_text(strip=True)
-                        semester = tds[1].get_text(strip=True)
-                        subject = tds[2].get_text(strip=True).replace('\xa0', ' ').replace('\u00a0', ' ').strip()
-                        grade_type = tds[3].get_text(strip=True)
-                        date = tds[4].get_text(strip=True)
-                        grade_value = tds[5].get_text(strip=True)
-
-                        raw_grades_list.append({
-                            'year': year,
-                            'semester': semester,
-                            'subject': subject,
-                            'type': grade_type,
-                            'date': date,
-                            'grade': grade_value
-                        })
-                    except IndexError:
-                        log_message(f"Skipping malformed row (fewer than 6 TDs): {tr.get_text()}", level="WARNING")
+                try:
+                    year = tds[0].text(strip=True)
+                    semester = tds[1].text(strip=True)
+                    subject = tds[2].text(strip=True).translate(_NBSP_TABLE)
+                    grade_type = tds[3].text(strip=True)
+                    date = tds[4].text(strip=True)
+                    grade_value = tds[5].text(strip=True)
+
+                    raw_grades_list.append({
+                        'year': year,
+                        'semester': semester,
+                        'subject': subject,
+                        'type': grade_type,
+                        'date': date,
+                        'grade': grade_value
+                    })
+                except IndexError:
+                    log_message(f"Skipping malformed row (fewer than 6 TDs): {tr.text()}", level="WARNING")
 
         # --- Process raw grades to keep only the latest date for each unique (subject, year, semester) ---
         processed_grades = {} # Key: (subject, year, semester), Value: latest grade entry
@@ -253,11 +331,11 @@ def load_previous_grades(user_identifier):
     user_grades_file = f"previous_grades_{user_identifier}.json"
     if os.path.exists(user_grades_file):
         try:
-            with open(user_grades_file, 'r', encoding='utf-8') as f:
-                grades = json.load(f)
+            with open(user_grades_file, 'rb') as f:
+                grades = orjson.loads(f.read())
                 log_message(f"Loaded {len(grades)} previous grades for user '{user_identifier}' from {user_grades_file}", level="INFO")
                 return grades
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             log_message(f"Error decoding JSON from {user_grades_file}: {e}. Starting with empty grades for '{user_identifier}'.", level="ERROR")
             return []
         except Exception as e:
@@ -270,8 +348,8 @@ def save_current_grades(user_identifier, grades):
     """Saves the current grades for a specific user to a JSON file."""
     user_grades_file = f"previous_grades_{user_identifier}.json"
     try:
-        with open(user_grades_file, 'w', encoding='utf-8') as f:
-            json.dump(grades, f, indent=4, ensure_ascii=False)
+        with open(user_grades_file, 'wb') as f:
+            f.write(orjson.dumps(grades, option=orjson.OPT_INDENT_2))
         log_message(f"Saved {len(grades)} current grades for user '{user_identifier}' to {user_grades_file}", level="INFO")
     except Exception as e:
         log_message(f"Error saving current grades for user '{user_identifier}' to {user_grades_file}: {e}", level="ERROR")
@@ -285,19 +363,17 @@ def compare_grades(old_grades, new_grades):
     new_grade_entries = []
     changed_grade_entries = []
 
-    old_grades_map = {}
-    for grade in old_grades:
-        key = (grade['subject'], grade['year'], grade['semester'])
-        old_grades_map[key] = grade['grade']
+    old_grades_map = {(grade['subject'], grade['year'], grade['semester']): grade['grade'] for grade in old_grades}
 
     for new_grade in new_grades:
         key = (new_grade['subject'], new_grade['year'], new_grade['semester'])
-        
-        if key not in old_grades_map:
+        old_grade = old_grades_map.get(key, _MISSING)
+
+        if old_grade is _MISSING:
             new_grade_entries.append(new_grade)
-        elif old_grades_map[key] != new_grade['grade']:
+        elif old_grade != new_grade['grade']:
             changed_grade_entries.append({
-                'old_grade': old_grades_map[key],
+                'old_grade': old_grade,
                 'new_grade': new_grade['grade'],
                 'subject': new_grade['subject'],
                 'year': new_grade['year'],
@@ -308,6 +384,93 @@ def compare_grades(old_grades, new_grades):
     return new_grade_entries, changed_grade_entries
 
 
+def process_user(user_identifier, global_ntfy_topic_url):
+    """
+    Runs check_user_grades with the current thread named after the user, so
+    log lines of users processed concurrently can be told apart.
+    """
+    thread = threading.current_thread()
+    previous_thread_name = thread.name
+    thread.name = user_identifier
+    try:
+        check_user_grades(user_identifier, global_ntfy_topic_url)
+    finally:
+        thread.name = previous_thread_name
+
+
+def check_user_grades(user_identifier, global_ntfy_topic_url):
+    """
+    Runs the full grade check for one user: login, grade retrieval, comparison
+    with the previously saved grades, notifications and saving the new grades.
+    """
+    log_message(f"\n--- Processing grades for user: '{user_identifier}' ---", level="INFO")
+
+    # Dynamically get username and password based on the user_identifier prefix
+    websinu_username = os.getenv(f"{user_identifier}_WEBSINU_USERNAME")
+    websinu_password = os.getenv(f"{user_identifier}_WEBSINU_PASSWORD")
+
+    log_message(f"'{user_identifier}_WEBSINU_USERNAME' loaded: {'Yes' if websinu_username else 'No'}", level="DEBUG")
+    log_message(f"'{user_identifier}_WEBSINU_PASSWORD' loaded: {'Yes' if websinu_password else 'No'}", level="DEBUG")
+
+
+    if not websinu_username or not websinu_password:
+        log_message(f"Error: WebSinu username or password not found in .env for user '{user_identifier}'. Skipping this user.", level="ERROR")
+        send_ntfy_notification(
+            global_ntfy_topic_url,
+            f"WebSinu credentials missing for user '{user_identifier}'. Skipping.",
+            title="WebSinu Agent Error",
+            tags=["error", "x"]
+        )
+        return
+    else:
+        # Load previous grades specific to this user identifier
+        previous_grades = load_previous_grades(user_identifier)
+
+        websinu_session, login_sid, initial_grades_html_content = login_websinu(websinu_username, websinu_password)
+
+        if websinu_session and login_sid and initial_grades_html_content:
+            log_message(f"\nAttempting to retrieve grades for user '{user_identifier}'...", level="INFO")
+            current_grades = get_grades(websinu_session, login_sid, initial_grades_html_content)
+
+            if current_grades:
+                log_message(f"Found {len(current_grades)} current grades for user '{user_identifier}'.", level="INFO")
+
+                if previous_grades and current_grades == previous_grades:
+                    # Identical scrape (the common case), nothing to compare
+                    log_message(f"No new or changed grades found for user '{user_identifier}'. Skipping notification.", level="INFO")
+
+                elif previous_grades:
+                    new_entries, changed_entries = compare_grades(previous_grades, current_grades)
+
+                    # All updates for this user are sent together in a single notification
+                    notifications = []
+                    for entry in new_entries:
+                        notifications.append(f"New grade for {user_identifier}: {entry['subject']} is {entry['grade']} (on {entry['date']})")
+                    for entry in changed_entries:
+                        notifications.append(f"Grade for {user_identifier}: {entry['subject']} changed from {entry['old_grade']} to {entry['new_grade']} (on {entry['date']})")
+
+                    if notifications:
+                        send_ntfy_notification(global_ntfy_topic_url, "\n".join(notifications), title=f"WebSinu updates for {user_identifier}", tags=["sparkles"])
+                        for msg in notifications:
+                            log_message(f"Notified: {msg}", level="INFO")
+                    else:
+                        # If no changes were found, no notification is sent (as per your request)
+                        log_message(f"No new or changed grades found for user '{user_identifier}'. Skipping notification.", level="INFO")
+
+                else:
+                    log_message(f"First run or no previous grades found for user '{user_identifier}'. Grades will be saved for future comparison.", level="INFO")
+                    # No notification for the first run, as it's not a 'change'
+
+                save_current_grades(user_identifier, current_grades)
+
+            else:
+                log_message(f"Could not retrieve current grades for user '{user_identifier}'.", level="ERROR")
+                send_ntfy_notification(global_ntfy_topic_url, f"Failed to retrieve grades for {user_identifier}. Check logs.", tags=["warning", "exclamation"])
+        else:
+            log_message(f"Login failed for user '{user_identifier}'. Cannot proceed to get grades.", level="ERROR")
+            send_ntfy_notification(global_ntfy_topic_url, f"WebSinu login failed for {user_identifier}. Check credentials or site changes.", tags=["error", "x"])
+
+
 if __name__ == "__main__":
     # Load environment variables from the single .env file
     load_dotenv() 
@@ -325,76 +488,25 @@ if __name__ == "__main__":
         log_message("CRITICAL ERROR: NTFY_TOPIC_URL not found in .env. Agent cannot send notifications. Please add NTFY_TOPIC_URL='your_ntfy_topic_url' to your .env file.", level="CRITICAL")
         exit(1) # Exit with an error code
 
-    # Loop for all users
-    for user_identifier in USER_IDENTIFIERS:
-        log_message(f"\n--- Processing grades for user: '{user_identifier}' ---", level="INFO")
-
-        # Dynamically get username and password based on the user_identifier prefix
-        websinu_username = os.getenv(f"{user_identifier}_WEBSINU_USERNAME")
-        websinu_password = os.getenv(f"{user_identifier}_WEBSINU_PASSWORD")
-
-        log_message(f"'{user_identifier}_WEBSINU_USERNAME' loaded: {'Yes' if websinu_username else 'No'}", level="DEBUG")
-        log_message(f"'{user_identifier}_WEBSINU_PASSWORD' loaded: {'Yes' if websinu_password else 'No'}", level="DEBUG")
-
-
-        if not websinu_username or not websinu_password:
-            log_message(f"Error: WebSinu username or password not found in .env for user '{user_identifier}'. Skipping this user.", level="ERROR")
-            send_ntfy_notification(
-                global_ntfy_topic_url,
-                f"WebSinu credentials missing for user '{user_identifier}'. Skipping.",
-                title="WebSinu Agent Error",
-                tags=["error", "x"]
-            )
-            continue
-        else:
-            # Load previous grades specific to this user identifier
-            previous_grades = load_previous_grades(user_identifier)
-
-            websinu_session, login_sid, initial_grades_html_content = login_websinu(websinu_username, websinu_password)
-
-            if websinu_session and login_sid and initial_grades_html_content:
-                log_message(f"\nAttempting to retrieve grades for user '{user_identifier}'...", level="INFO")
-                current_grades = get_grades(websinu_session, login_sid, initial_grades_html_content)
-
-                if current_grades:
-                    log_message(f"Found {len(current_grades)} current grades for user '{user_identifier}'.", level="INFO")
-                    
-                    if previous_grades:
-                        new_entries, changed_entries = compare_grades(previous_grades, current_grades)
-
-                        if new_entries:
-                            for entry in new_entries:
-                                msg = f"New grade for {user_identifier}: {entry['subject']} is {entry['grade']} (on {entry['date']})"
-                                send_ntfy_notification(global_ntfy_topic_url, msg, title=f"New WebSinu Grade for {user_identifier}!", tags=["new", "sparkles"])
-                                log_message(f"Notified: {msg}", level="INFO")
-                        
-                        if changed_entries:
-                            for entry in changed_entries:
-                                msg = f"Grade for {user_identifier}: {entry['subject']} changed from {entry['old_grade']} to {entry['new_grade']} (on {entry['date']})"
-                                send_ntfy_notification(global_ntfy_topic_url, msg, title=f"WebSinu Grade Changed for {user_identifier}!", tags=["changed", "warning"])
-                                log_message(f"Notified: {msg}", level="INFO")
-
-                        # If no changes were found, no notification is sent (as per your request)
-                        if not new_entries and not changed_entries:
-                            log_message(f"No new or changed grades found for user '{user_identifier}'. Skipping notification.", level="INFO")
-
-                    else:
-                        log_message(f"First run or no previous grades found for user '{user_identifier}'. Grades will be saved for future comparison.", level="INFO")
-                        # No notification for the first run, as it's not a 'change'
-                        
-                    save_current_grades(user_identifier, current_grades)
-
-                else:
-                    log_message(f"Could not retrieve current grades for user '{user_identifier}'.", level="ERROR")
-                    send_ntfy_notification(global_ntfy_topic_url, f"Failed to retrieve grades for {user_identifier}. Check logs.", tags=["warning", "exclamation"])
-            else:
-                log_message(f"Login failed for user '{user_identifier}'. Cannot proceed to get grades.", level="ERROR")
-                send_ntfy_notification(global_ntfy_topic_url, f"WebSinu login failed for {user_identifier}. Check credentials or site changes.", tags=["error", "x"])
-        
-        # Add a small delay before processing the next user
-        if user_identifier != USER_IDENTIFIERS[-1]:
-            log_message(f"Pausing for {DELAY_BETWEEN_USERS_SECONDS} seconds before next user...", level="INFO")
-            time.sleep(DELAY_BETWEEN_USERS_SECONDS)
+    # Each user logs in with its own WebSinu session, so users can be processed concurrently.
+    # With fewer than two users there is nothing to parallelize (and an empty pool can't be created).
+    if MAX_PARALLEL_USERS > 1 and len(USER_IDENTIFIERS) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_USERS, len(USER_IDENTIFIERS))) as executor:
+            list(executor.map(lambda user_identifier: process_user(user_identifier, global_ntfy_topic_url), USER_IDENTIFIERS))
+    else:
+        # Start users at least DELAY_BETWEEN_USERS_SECONDS apart; time spent on the previous user counts towards the delay
+        next_ok_at = time.monotonic()
+        for user_identifier in USER_IDENTIFIERS:
+            now = time.monotonic()
+            if now < next_ok_at:
+                log_message(f"Pausing for {next_ok_at - now:.1f} seconds before next user...", level="INFO")
+                time.sleep(next_ok_at - now)
+
+            next_ok_at = time.monotonic() + DELAY_BETWEEN_USERS_SECONDS
+            process_user(user_identifier, global_ntfy_topic_url)
+
+    # Wait for queued notifications to be sent before exiting
+    _NTFY_EXECUTOR.shutdown(wait=True)
 
     log_message("\n--- All user grade checks completed ---", level="INFO")
     # No final "batch complete" notification, as per your request